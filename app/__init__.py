@@ -1,3 +1,12 @@
-from app.agent import root_agent
+from typing import Any
 
 __all__ = ["root_agent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Defer importing the agent module until the root agent is first requested.
+    if name == "root_agent":
+        from app.agent import root_agent
+
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
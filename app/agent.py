@@ -1,27 +1,46 @@
 
 import datetime
+import functools
+import hashlib
+import json
 import logging
 import re
-from collections.abc import AsyncGenerator
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from typing import Literal
 
-from google.adk.agents import BaseAgent, LlmAgent, LoopAgent, SequentialAgent
+from google.adk.agents import (
+    BaseAgent,
+    LlmAgent,
+    LoopAgent,
+    ParallelAgent,
+    SequentialAgent,
+)
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.agents.invocation_context import InvocationContext
-from google.adk.events import Event, EventActions
+from google.adk.models import LlmRequest, LlmResponse
 from google.adk.planners import BuiltInPlanner
 from google.adk.tools import google_search
 from google.adk.tools.agent_tool import AgentTool
 from google.genai import types as genai_types
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .config import config
 
+_CITE_RE = re.compile(r'<cite\s+source\s*=\s*["\']?\s*(src-\d+)\s*["\']?\s*/>')
+_PUNCT_RE = re.compile(r"\s+([.,;:])")
+# Longest partial `<cite ... />` tag held back from a streamed chunk.
+_MAX_PENDING_CITATION = 64
+_PENDING_CITATION_KEY = "temp:pending_citation_text"
+_CITATION_LINKS_KEY = "temp:citation_links"
+
 
 # --- Structured Output Models ---
 class SearchQuery(BaseModel):
     """Model representing a specific search query for web search."""
 
+    model_config = ConfigDict(frozen=True)
+
     search_query: str = Field(
         description="A highly specific and targeted query for web search."
     )
@@ -30,6 +49,8 @@ class SearchQuery(BaseModel):
 class Feedback(BaseModel):
     """Model for providing evaluation feedback on research quality."""
 
+    model_config = ConfigDict(frozen=True)
+
     grade: Literal["pass", "fail"] = Field(
         description="Evaluation result. 'pass' if the research is sufficient, 'fail' if it needs revision."
     )
@@ -43,48 +64,71 @@ class Feedback(BaseModel):
 
 
 # --- Callbacks ---
+_today: tuple[datetime.date, str] | None = None
+
+
+def today_str() -> str:
+    """Returns today's date as YYYY-MM-DD, formatted at most once per day."""
+    global _today
+    today = datetime.date.today()
+    if _today is None or _today[0] != today:
+        _today = (today, today.isoformat())
+    return _today[1]
+
+
+def current_date_callback(callback_context: CallbackContext) -> None:
+    """Stores today's date in state for the `{current_date}` instruction placeholder."""
+    today = today_str()
+    if callback_context.state.get("current_date") != today:
+        callback_context.state["current_date"] = today
+
+
 def collect_research_sources_callback(callback_context: CallbackContext) -> None:
     """Collects and organizes web-based research sources and their supported claims from agent events."""
     session = callback_context._invocation_context.session
     url_to_short_id = callback_context.state.get("url_to_short_id", {})
     sources = callback_context.state.get("sources", {})
     id_counter = len(url_to_short_id) + 1
-    for event in session.events:
-        if not (event.grounding_metadata and event.grounding_metadata.grounding_chunks):
+    # Events before the watermark were collected by an earlier call.
+    events = session.events
+    start = callback_context.state.get("_last_event_idx", 0)
+    for event in events[start:]:
+        gm = event.grounding_metadata
+        if not (gm and gm.grounding_chunks):
             continue
-        chunks_info = {}
-        for idx, chunk in enumerate(event.grounding_metadata.grounding_chunks):
-            if not chunk.web:
+        chunks = gm.grounding_chunks
+        chunks_info: list[str | None] = [None] * len(chunks)
+        for idx, chunk in enumerate(chunks):
+            web = chunk.web
+            if not web:
                 continue
-            url = chunk.web.uri
-            title = (
-                chunk.web.title
-                if chunk.web.title != chunk.web.domain
-                else chunk.web.domain
-            )
-            if url not in url_to_short_id:
+            url = web.uri
+            short_id = url_to_short_id.get(url)
+            if short_id is None:
                 short_id = f"src-{id_counter}"
                 url_to_short_id[url] = short_id
                 sources[short_id] = {
                     "short_id": short_id,
-                    "title": title,
+                    "title": web.title,
                     "url": url,
-                    "domain": chunk.web.domain,
+                    "domain": web.domain,
                     "supported_claims": [],
                 }
                 id_counter += 1
-            chunks_info[idx] = url_to_short_id[url]
-        if event.grounding_metadata.grounding_supports:
-            for support in event.grounding_metadata.grounding_supports:
-                confidence_scores = support.confidence_scores or []
-                chunk_indices = support.grounding_chunk_indices or []
+            chunks_info[idx] = short_id
+        if supports := gm.grounding_supports:
+            for support in supports:
+                confidence_scores = support.confidence_scores or ()
+                chunk_indices = support.grounding_chunk_indices or ()
+                n_conf = len(confidence_scores)
+                seg = support.segment
+                text_segment = seg.text if seg else ""
                 for i, chunk_idx in enumerate(chunk_indices):
-                    if chunk_idx in chunks_info:
-                        short_id = chunks_info[chunk_idx]
-                        confidence = (
-                            confidence_scores[i] if i < len(confidence_scores) else 0.5
-                        )
-                        text_segment = support.segment.text if support.segment else ""
+                    if (
+                        0 <= chunk_idx < len(chunks_info)
+                        and (short_id := chunks_info[chunk_idx]) is not None
+                    ):
+                        confidence = confidence_scores[i] if i < n_conf else 0.5
                         sources[short_id]["supported_claims"].append(
                             {
                                 "text_segment": text_segment,
@@ -93,273 +137,486 @@ def collect_research_sources_callback(callback_context: CallbackContext) -> None
                         )
     callback_context.state["url_to_short_id"] = url_to_short_id
     callback_context.state["sources"] = sources
+    callback_context.state["_last_event_idx"] = len(events)
+
+
+def escalate_on_pass_callback(callback_context: CallbackContext) -> None:
+    """Escalates to stop the refinement loop if the research evaluation passed."""
+    evaluation = callback_context.state.get("research_evaluation")
+    if evaluation and evaluation.get("grade") == "pass":
+        logging.info(
+            f"[{callback_context.agent_name}] Research evaluation passed. Escalating to stop loop."
+        )
+        callback_context._event_actions.escalate = True
+        # ADK only emits callback actions alongside a state delta.
+        callback_context.state["research_evaluation"] = evaluation
+
+
+def merge_follow_up_findings_callback(callback_context: CallbackContext) -> None:
+    """Appends the parallel follow-up findings to the section research findings."""
+    state = callback_context.state
+    findings = [state.get("section_research_findings", "")]
+    for index in range(config.max_follow_up_queries):
+        if finding := state.get(f"follow_up_findings_{index}"):
+            query = state.get(f"follow_up_query_{index}", "")
+            findings.append(f"### Follow-up: {query}\n\n{finding}")
+    state["section_research_findings"] = "\n\n".join(filter(None, findings))
+
+
+def _citation_links(sources: dict) -> dict[str, str]:
+    """Formats the Markdown link for every source once, keyed by short id."""
+    return {
+        short_id: f" [{source_info.get('title') or source_info.get('domain') or short_id}]({source_info['url']})"
+        for short_id, source_info in sources.items()
+    }
+
+
+def citation_links_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> None:
+    """Builds the citation link table once, before the report is generated."""
+    callback_context.state[_CITATION_LINKS_KEY] = _citation_links(
+        callback_context.state.get("sources", {})
+    )
 
 
-def citation_replacement_callback(
-    callback_context: CallbackContext,
-) -> genai_types.Content:
-    """Replaces citation tags in a report with Markdown-formatted links."""
-    final_report = callback_context.state.get("final_cited_report", "")
-    sources = callback_context.state.get("sources", {})
+def _render_citations(report: str, links: dict[str, str]) -> str:
+    """Replaces citation tags in a report with their precomputed links."""
 
     def tag_replacer(match: re.Match) -> str:
-        short_id = match.group(1)
-        if not (source_info := sources.get(short_id)):
+        if (link := links.get(match.group(1))) is None:
             logging.warning(f"Invalid citation tag found and removed: {match.group(0)}")
             return ""
-        display_text = source_info.get("title", source_info.get("domain", short_id))
-        return f" [{display_text}]({source_info['url']})"
+        return link
 
-    processed_report = re.sub(
-        r'<cite\s+source\s*=\s*["\']?\s*(src-\d+)\s*["\']?\s*/>',
-        tag_replacer,
-        final_report,
-    )
-    processed_report = re.sub(r"\s+([.,;:])", r"\1", processed_report)
-    callback_context.state["final_report_with_citations"] = processed_report
-    return genai_types.Content(parts=[genai_types.Part(text=processed_report)])
+    return _CITE_RE.sub(tag_replacer, report)
 
 
-# --- Custom Agent for Loop Control ---
-class EscalationChecker(BaseAgent):
-    """Checks research evaluation and escalates to stop the loop if grade is 'pass'."""
+def citation_replacement_callback(callback_context: CallbackContext) -> None:
+    """Publishes the report, already rendered by `citation_streaming_callback`."""
+    callback_context.state["final_report_with_citations"] = callback_context.state.get(
+        "final_cited_report", ""
+    )
 
-    def __init__(self, name: str):
-        super().__init__(name=name)
 
-    async def _run_async_impl(
-        self, ctx: InvocationContext
-    ) -> AsyncGenerator[Event, None]:
-        evaluation_result = ctx.session.state.get("research_evaluation")
-        if evaluation_result and evaluation_result.get("grade") == "pass":
-            logging.info(
-                f"[{self.name}] Research evaluation passed. Escalating to stop loop."
+def _render_citation_chunk(text: str, links: dict[str, str]) -> tuple[str, str]:
+    """Renders a streamed chunk, holding back what the next chunk may extend.
+
+    Returns the rendered text and the raw remainder: a trailing partial
+    citation tag plus any whitespace that may precede punctuation.
+    """
+    start = text.rfind("<")
+    tail = text[start:]
+    pending = ""
+    if (
+        start != -1
+        and "/>" not in tail
+        and len(tail) <= _MAX_PENDING_CITATION
+        and (tail.startswith("<cite") or "<cite".startswith(tail))
+    ):
+        text, pending = text[:start], tail
+    rendered = _render_citations(text, links)
+    stripped = rendered.rstrip()
+    return _PUNCT_RE.sub(r"\1", stripped), rendered[len(stripped) :] + pending
+
+
+def citation_streaming_callback(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> LlmResponse | None:
+    """Renders citation tags in model responses, including streamed chunks.
+
+    Links come from the table stored by `citation_links_callback`. Partial
+    chunks hold back a trailing, still incomplete tag in `temp:` state until
+    the next chunk arrives; the chunk carrying the finish reason flushes it.
+    The final aggregated response is rendered in full.
+    """
+    content = llm_response.content
+    parts = content.parts if content and content.parts else []
+    text = "".join(part.text for part in parts if part.text and not part.thought)
+    state = callback_context.state
+    if llm_response.partial:
+        text = state.get(_PENDING_CITATION_KEY, "") + text
+    if not text:
+        return None
+    links = state.get(_CITATION_LINKS_KEY, {})
+    if llm_response.partial and not llm_response.finish_reason:
+        rendered, pending = _render_citation_chunk(text, links)
+    else:
+        rendered, pending = _PUNCT_RE.sub(r"\1", _render_citations(text, links)), ""
+    if llm_response.partial and state.get(_PENDING_CITATION_KEY, "") != pending:
+        state[_PENDING_CITATION_KEY] = pending
+    return llm_response.model_copy(
+        update={
+            "content": genai_types.Content(
+                role=content.role if content else "model",
+                parts=[genai_types.Part(text=rendered)],
             )
-            yield Event(author=self.name, actions=EventActions(escalate=True))
-        else:
+        }
+    )
+
+
+# --- Model Response Cache ---
+_response_cache: OrderedDict[str, tuple[float, LlmResponse]] = OrderedDict()
+
+
+def _llm_request_cache_key(llm_request: LlmRequest) -> str:
+    """Hashes everything the model sees: model, config, instruction and contents."""
+    payload = {
+        "model": llm_request.model,
+        "config": llm_request.config.model_dump(exclude_none=True),
+        "contents": [
+            content.model_dump(exclude_none=True) for content in llm_request.contents
+        ],
+    }
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def cached_model_response_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """Replays the stored response for an identical, unexpired model request."""
+    key = _llm_request_cache_key(llm_request)
+    if cached := _response_cache.get(key):
+        stored_at, response = cached
+        if time.monotonic() - stored_at < config.response_cache_ttl_seconds:
             logging.info(
-                f"[{self.name}] Research evaluation failed or not found. Loop will continue."
+                f"[{callback_context.agent_name}] Replaying cached model response."
             )
-            yield Event(author=self.name)
+            _response_cache.move_to_end(key)
+            return response.model_copy(deep=True)
+        del _response_cache[key]
+    callback_context.state["temp:response_cache_key"] = key
+    return None
+
+
+def store_model_response_callback(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> None:
+    """Caches a complete model response under the key of its request."""
+    key = callback_context.state.get("temp:response_cache_key")
+    if (
+        not key
+        or llm_response.partial
+        or llm_response.error_code
+        or not (llm_response.content and llm_response.content.parts)
+    ):
+        return None
+    _response_cache[key] = (time.monotonic(), llm_response.model_copy(deep=True))
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > config.response_cache_size:
+        _response_cache.popitem(last=False)
+    return None
 
 
 # --- AGENT DEFINITIONS ---
-plan_generator = LlmAgent(
-    model=config.worker_model,
-    name="plan_generator",
-    description="Generates or refines a strategic consulting plan focused on corporate management and marketing systems.",
-    instruction=f"""
-    You are ziris-x, a world-class strategic consultant specializing in corporate management and marketing systems.
-    Your role is to create a high-level CONSULTING ACTION PLAN—not a summary—tailored to the user’s business challenge.
-
-    If a plan already exists in session state, refine it based on user feedback.
-
-    **CONSULTING PLAN(SO FAR):**
-    {{ research_plan? }}
-
-    **TASK CLASSIFICATION RULES:**
-    Each bullet must start with a task-type prefix:
-    - **`[ANALYSIS]`**: For diagnostic, investigative, or data-gathering tasks (e.g., "Analyze current marketing funnel inefficiencies").
-    - **`[STRATEGY]`**: For synthesizing insights into actionable frameworks, recommendations, or deliverables (e.g., "Design a go-to-market strategy for Product X").
-
-    **INITIAL OUTPUT REQUIREMENTS:**
-    - Begin with exactly 5 action-oriented consulting goals.
-    - All initial goals must be `[ANALYSIS]`.
-    - Use strong verbs: Assess, Diagnose, Benchmark, Map, Evaluate.
-    - **Proactively add implied deliverables** as `[STRATEGY][IMPLIED]` if a natural output is expected (e.g., a SWOT table, org chart, campaign roadmap).
-
-    **REFINEMENT RULES:**
-    - Mark modified tasks with `[MODIFIED]`, new ones with `[NEW]`.
-    - Maintain original order; append new items unless instructed otherwise.
-    - Expand beyond 5 bullets if needed to cover strategic depth.
-
-    **SEARCH RESTRICTION:**
-    Only use `google_search` if the business domain, industry, or company is ambiguous.
-    Never research content—only clarify scope. You are a strategist, not a data miner.
-
-    Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
-    """,
-    tools=[google_search],
-)
+@functools.cache
+def _plan_generator() -> LlmAgent:
+    return LlmAgent(
+        model=config.worker_model,
+        name="plan_generator",
+        description="Generates or refines a strategic consulting plan focused on corporate management and marketing systems.",
+        instruction="""
+        You are ziris-x, a world-class strategic consultant specializing in corporate management and marketing systems.
+        Your role is to create a high-level CONSULTING ACTION PLAN—not a summary—tailored to the user’s business challenge.
+
+        If a plan already exists in session state, refine it based on user feedback.
+
+        **CONSULTING PLAN(SO FAR):**
+        { research_plan? }
+
+        **TASK CLASSIFICATION RULES:**
+        Each bullet must start with a task-type prefix:
+        - **`[ANALYSIS]`**: For diagnostic, investigative, or data-gathering tasks (e.g., "Analyze current marketing funnel inefficiencies").
+        - **`[STRATEGY]`**: For synthesizing insights into actionable frameworks, recommendations, or deliverables (e.g., "Design a go-to-market strategy for Product X").
+
+        **INITIAL OUTPUT REQUIREMENTS:**
+        - Begin with exactly 5 action-oriented consulting goals.
+        - All initial goals must be `[ANALYSIS]`.
+        - Use strong verbs: Assess, Diagnose, Benchmark, Map, Evaluate.
+        - **Proactively add implied deliverables** as `[STRATEGY][IMPLIED]` if a natural output is expected (e.g., a SWOT table, org chart, campaign roadmap).
+
+        **REFINEMENT RULES:**
+        - Mark modified tasks with `[MODIFIED]`, new ones with `[NEW]`.
+        - Maintain original order; append new items unless instructed otherwise.
+        - Expand beyond 5 bullets if needed to cover strategic depth.
+
+        **SEARCH RESTRICTION:**
+        Only use `google_search` if the business domain, industry, or company is ambiguous.
+        Never research content—only clarify scope. You are a strategist, not a data miner.
+
+        Current date: {current_date}
+        """,
+        tools=[google_search],
+        before_agent_callback=current_date_callback,
+        before_model_callback=cached_model_response_callback,
+        after_model_callback=store_model_response_callback,
+    )
 
 
-section_planner = LlmAgent(
-    model=config.worker_model,
-    name="section_planner",
-    description="Structures the consulting plan into a professional report outline for corporate clients.",
-    instruction="""
-    You are a senior management consultant at ziris-x. Create a clear, executive-ready markdown outline for a consulting report based on the approved plan.
+@functools.cache
+def _section_planner() -> LlmAgent:
+    return LlmAgent(
+        model=config.worker_model,
+        name="section_planner",
+        description="Structures the consulting plan into a professional report outline for corporate clients.",
+        instruction="""
+        You are a senior management consultant at ziris-x. Create a clear, executive-ready markdown outline for a consulting report based on the approved plan.
+
+        Ignore all tags like [ANALYSIS], [STRATEGY], etc.
+
+        Structure the report into 4–6 logical sections covering:
+        - Current state assessment
+        - Key challenges & opportunities
+        - Strategic recommendations
+        - Implementation roadmap (if applicable)
+
+        Do NOT include a References section. Citations will be inline.
+
+        Use professional consulting language. Example:
+        # Strategic Marketing Assessment
+        Overview of current digital marketing performance, channel efficiency, and competitive positioning.
+        """,
+        output_key="report_sections",
+        before_model_callback=cached_model_response_callback,
+        after_model_callback=store_model_response_callback,
+    )
 
-    Ignore all tags like [ANALYSIS], [STRATEGY], etc.
 
-    Structure the report into 4–6 logical sections covering:
-    - Current state assessment
-    - Key challenges & opportunities
-    - Strategic recommendations
-    - Implementation roadmap (if applicable)
+@functools.cache
+def _section_researcher() -> LlmAgent:
+    return LlmAgent(
+        model=config.worker_model,
+        name="section_researcher",
+        description="Executes deep-dive research on corporate management and marketing best practices.",
+        planner=BuiltInPlanner(
+            thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
+        ),
+        instruction="""
+        You are ziris-x’s research engine, focused exclusively on corporate strategy, organizational design, and marketing systems.
+
+        You will receive a plan with `[ANALYSIS]` and `[STRATEGY]` tasks.
+
+        **Phase 1: Diagnostic Research (`[ANALYSIS]` Tasks)**
+        - For each `[ANALYSIS]` goal, generate 4–5 precise search queries targeting frameworks, benchmarks, case studies, or industry standards.
+        - Plan all queries for every `[ANALYSIS]` goal before searching, then use `google_search` to execute them.
+        - Summarize findings with actionable insights, citing credible sources (e.g., McKinsey, HBR, Gartner, Statista).
+
+        **Phase 2: Strategic Synthesis (`[STRATEGY]` Tasks)**
+        - Only begin after all `[ANALYSIS]` tasks are complete.
+        - For each `[STRATEGY]` goal, produce the exact deliverable requested (e.g., a RACI matrix, customer journey map, marketing mix proposal).
+        - Use ONLY data from Phase 1—no new searches.
+        - Output must be structured, professional, and ready for C-suite review.
+
+        Final output: All summaries + all strategic deliverables.
+        """,
+        tools=[google_search],
+        output_key="section_research_findings",
+        after_agent_callback=collect_research_sources_callback,
+    )
 
-    Do NOT include a References section. Citations will be inline.
 
-    Use professional consulting language. Example:
-    # Strategic Marketing Assessment
-    Overview of current digital marketing performance, channel efficiency, and competitive positioning.
-    """,
-    output_key="report_sections",
-)
+@functools.cache
+def _research_evaluator() -> LlmAgent:
+    return LlmAgent(
+        model=config.critic_model,
+        name="research_evaluator",
+        description="Evaluates the strategic depth and practical relevance of consulting research.",
+        instruction="""
+        You are ziris-x’s quality assurance lead. Evaluate the consulting research for strategic rigor, practical applicability, and alignment with modern management/marketing principles.
+
+        **Focus Areas:**
+        - Depth of diagnostic insight
+        - Relevance to real-world business operations
+        - Use of authoritative, up-to-date sources
+        - Clarity and actionability of recommendations
+
+        **Do NOT question the business premise.** Assume the client’s context is valid.
+
+        If gaps exist (e.g., missing competitor analysis, superficial org assessment), grade "fail", explain why, and provide 5–7 targeted follow-up queries.
+
+        If the analysis is comprehensive and strategic, grade "pass".
+
+        Current date: {current_date}
+        Respond with a raw JSON object matching the 'Feedback' schema.
+        """,
+        output_schema=Feedback,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+        output_key="research_evaluation",
+        before_agent_callback=current_date_callback,
+        after_agent_callback=escalate_on_pass_callback,
+        before_model_callback=cached_model_response_callback,
+        after_model_callback=store_model_response_callback,
+    )
 
 
-section_researcher = LlmAgent(
-    model=config.worker_model,
-    name="section_researcher",
-    description="Executes deep-dive research on corporate management and marketing best practices.",
-    planner=BuiltInPlanner(
-        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-    ),
-    instruction="""
-    You are ziris-x’s research engine, focused exclusively on corporate strategy, organizational design, and marketing systems.
-
-    You will receive a plan with `[ANALYSIS]` and `[STRATEGY]` tasks.
-
-    **Phase 1: Diagnostic Research (`[ANALYSIS]` Tasks)**
-    - For each `[ANALYSIS]` goal, generate 4–5 precise search queries targeting frameworks, benchmarks, case studies, or industry standards.
-    - Use `google_search` to execute all queries.
-    - Summarize findings with actionable insights, citing credible sources (e.g., McKinsey, HBR, Gartner, Statista).
-
-    **Phase 2: Strategic Synthesis (`[STRATEGY]` Tasks)**
-    - Only begin after all `[ANALYSIS]` tasks are complete.
-    - For each `[STRATEGY]` goal, produce the exact deliverable requested (e.g., a RACI matrix, customer journey map, marketing mix proposal).
-    - Use ONLY data from Phase 1—no new searches.
-    - Output must be structured, professional, and ready for C-suite review.
-
-    Final output: All summaries + all strategic deliverables.
-    """,
-    tools=[google_search],
-    output_key="section_research_findings",
-    after_agent_callback=collect_research_sources_callback,
-)
+_FOLLOW_UP_SEARCHER_INSTRUCTION = """
+    You are one of ziris-x’s follow-up research specialists.
 
-research_evaluator = LlmAgent(
-    model=config.critic_model,
-    name="research_evaluator",
-    description="Evaluates the strategic depth and practical relevance of consulting research.",
-    instruction=f"""
-    You are ziris-x’s quality assurance lead. Evaluate the consulting research for strategic rigor, practical applicability, and alignment with modern management/marketing principles.
+    Use `google_search` to research the query below, then summarize the findings with actionable insights, citing credible sources.
 
-    **Focus Areas:**
-    - Depth of diagnostic insight
-    - Relevance to real-world business operations
-    - Use of authoritative, up-to-date sources
-    - Clarity and actionability of recommendations
+    **QUERY:**
+    {{{query_key}}}
+    """
 
-    **Do NOT question the business premise.** Assume the client’s context is valid.
 
-    If gaps exist (e.g., missing competitor analysis, superficial org assessment), grade "fail", explain why, and provide 5–7 targeted follow-up queries.
+def _make_follow_up_searcher(index: int) -> LlmAgent:
+    """Builds the searcher that handles the follow-up query at `index`, if any."""
 
-    If the analysis is comprehensive and strategic, grade "pass".
+    def assign_follow_up_query(
+        callback_context: CallbackContext,
+    ) -> genai_types.Content | None:
+        evaluation = callback_context.state.get("research_evaluation") or {}
+        queries = evaluation.get("follow_up_queries") or []
+        if index == 0 and len(queries) > config.max_follow_up_queries:
+            logging.warning(
+                f"[{callback_context.agent_name}] Dropping "
+                f"{len(queries) - config.max_follow_up_queries} follow-up queries "
+                f"beyond max_follow_up_queries={config.max_follow_up_queries}."
+            )
+        # An empty final response does not write output_key, so clear the
+        # previous iteration's finding before it could be merged again.
+        callback_context.state[f"follow_up_findings_{index}"] = ""
+        if index >= len(queries):
+            return genai_types.Content(parts=[])
+        callback_context.state[f"follow_up_query_{index}"] = queries[index][
+            "search_query"
+        ]
+        return None
+
+    return LlmAgent(
+        model=config.worker_model,
+        name=f"follow_up_searcher_{index}",
+        include_contents="none",
+        description="Researches a single follow-up query from the evaluator.",
+        instruction=_FOLLOW_UP_SEARCHER_INSTRUCTION.format_map(
+            {"query_key": f"follow_up_query_{index}"}
+        ),
+        tools=[google_search],
+        output_key=f"follow_up_findings_{index}",
+        before_agent_callback=assign_follow_up_query,
+    )
 
-    Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
-    Respond with a raw JSON object matching the 'Feedback' schema.
-    """,
-    output_schema=Feedback,
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-    output_key="research_evaluation",
-)
 
-enhanced_search_executor = LlmAgent(
-    model=config.worker_model,
-    name="enhanced_search_executor",
-    description="Refines consulting research based on evaluator feedback.",
-    planner=BuiltInPlanner(
-        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-    ),
-    instruction="""
-    You are ziris-x’s refinement specialist. The initial research was deemed insufficient.
-
-    Steps:
-    1. Review the 'research_evaluation' feedback.
-    2. Execute every query in 'follow_up_queries' using `google_search`.
-    3. Integrate new insights with existing findings to produce a comprehensive, boardroom-ready analysis.
-    4. Output the complete, improved research set.
-    """,
-    tools=[google_search],
-    output_key="section_research_findings",
-    after_agent_callback=collect_research_sources_callback,
-)
+@functools.cache
+def _enhanced_search_executor() -> ParallelAgent:
+    return ParallelAgent(
+        name="enhanced_search_executor",
+        description="Refines consulting research by running every follow-up query concurrently.",
+        sub_agents=[
+            _make_follow_up_searcher(index)
+            for index in range(config.max_follow_up_queries)
+        ],
+        after_agent_callback=[
+            merge_follow_up_findings_callback,
+            collect_research_sources_callback,
+        ],
+    )
 
-report_composer = LlmAgent(
-    model=config.critic_model,
-    name="report_composer_with_citations",
-    include_contents="none",
-    description="Composes a final executive consulting report with inline citations.",
-    instruction="""
-    You are the lead consultant at ziris-x. Transform the research and outline into a polished, persuasive executive report.
-
-    ---
-    ### INPUTS
-    *   Consulting Plan: `{research_plan}`
-    *   Findings & Deliverables: `{section_research_findings}`
-    *   Sources: `{sources}`
-    *   Report Outline: `{report_sections}`
-
-    ---
-    ### CITATION FORMAT
-    Insert inline citations using: `<cite source="src-ID_NUMBER" />`
-
-    ---
-    ### OUTPUT RULES
-    - Follow the outline exactly.
-    - Write in clear, confident, boardroom-appropriate language.
-    - Every strategic claim must be backed by a citation.
-    - No standalone references section.
-    """,
-    output_key="final_cited_report",
-    after_agent_callback=citation_replacement_callback,
-)
 
-research_pipeline = SequentialAgent(
-    name="research_pipeline",
-    description="Executes ziris-x’s end-to-end consulting workflow: analysis → strategy → executive report.",
-    sub_agents=[
-        section_planner,
-        section_researcher,
-        LoopAgent(
-            name="iterative_refinement_loop",
-            max_iterations=config.max_search_iterations,
-            sub_agents=[
-                research_evaluator,
-                EscalationChecker(name="escalation_checker"),
-                enhanced_search_executor,
-            ],
-        ),
-        report_composer,
-    ],
-)
+@functools.cache
+def _report_composer() -> LlmAgent:
+    return LlmAgent(
+        model=config.critic_model,
+        name="report_composer_with_citations",
+        include_contents="none",
+        description="Composes a final executive consulting report with inline citations.",
+        instruction="""
+        You are the lead consultant at ziris-x. Transform the research and outline into a polished, persuasive executive report.
+
+        ---
+        ### INPUTS
+        *   Consulting Plan: `{research_plan}`
+        *   Findings & Deliverables: `{section_research_findings}`
+        *   Sources: `{sources}`
+        *   Report Outline: `{report_sections}`
+
+        ---
+        ### CITATION FORMAT
+        Insert inline citations using: `<cite source="src-ID_NUMBER" />`
+
+        ---
+        ### OUTPUT RULES
+        - Follow the outline exactly.
+        - Write in clear, confident, boardroom-appropriate language.
+        - Every strategic claim must be backed by a citation.
+        - No standalone references section.
+        """,
+        output_key="final_cited_report",
+        before_model_callback=citation_links_callback,
+        after_model_callback=citation_streaming_callback,
+        after_agent_callback=citation_replacement_callback,
+    )
+
+
+@functools.cache
+def _research_pipeline() -> SequentialAgent:
+    return SequentialAgent(
+        name="research_pipeline",
+        description="Executes ziris-x’s end-to-end consulting workflow: analysis → strategy → executive report.",
+        sub_agents=[
+            _section_planner(),
+            _section_researcher(),
+            LoopAgent(
+                name="iterative_refinement_loop",
+                max_iterations=config.max_search_iterations,
+                sub_agents=[
+                    _research_evaluator(),
+                    _enhanced_search_executor(),
+                ],
+            ),
+            _report_composer(),
+        ],
+    )
+
+
+@functools.cache
+def _interactive_planner_agent() -> LlmAgent:
+    return LlmAgent(
+        name="ziris-x",
+        model=config.worker_model,
+        description="ziris-x: Your AI strategic consultant for corporate management and marketing systems.",
+        instruction="""
+        You are ziris-x — a premier AI consultant specializing in corporate strategy, organizational effectiveness, and integrated marketing systems.
+
+        **Your mission:** Convert every user request into a tailored consulting engagement.
+
+        **Workflow:**
+        1. **Diagnose**: Use `plan_generator` to propose a strategic action plan.
+        2. **Align**: Refine the plan with user input until approved.
+        3. **Deliver**: Upon explicit approval (e.g., “Proceed” or “Run the analysis”), delegate to `research_pipeline`.
+
+        **Rules:**
+        - Never answer directly. Always initiate a consulting plan.
+        - Frame everything through the lens of management best practices or marketing excellence.
+        - Speak with authority, clarity, and strategic foresight.
+
+        Current date: {current_date}
+        """,
+        sub_agents=[_research_pipeline()],
+        tools=[AgentTool(_plan_generator())],
+        output_key="research_plan",
+        before_agent_callback=current_date_callback,
+    )
 
-interactive_planner_agent = LlmAgent(
-    name="ziris-x",
-    model=config.worker_model,
-    description="ziris-x: Your AI strategic consultant for corporate management and marketing systems.",
-    instruction=f"""
-    You are ziris-x — a premier AI consultant specializing in corporate strategy, organizational effectiveness, and integrated marketing systems.
-
-    **Your mission:** Convert every user request into a tailored consulting engagement.
-
-    **Workflow:**
-    1. **Diagnose**: Use `plan_generator` to propose a strategic action plan.
-    2. **Align**: Refine the plan with user input until approved.
-    3. **Deliver**: Upon explicit approval (e.g., “Proceed” or “Run the analysis”), delegate to `research_pipeline`.
-
-    **Rules:**
-    - Never answer directly. Always initiate a consulting plan.
-    - Frame everything through the lens of management best practices or marketing excellence.
-    - Speak with authority, clarity, and strategic foresight.
-
-    Current date: {datetime.datetime.now().strftime("%Y-%m-%d")}
-    """,
-    sub_agents=[research_pipeline],
-    tools=[AgentTool(plan_generator)],
-    output_key="research_plan",
-)
 
-root_agent = interactive_planner_agent
+_AGENT_FACTORIES: dict[str, Callable[[], BaseAgent]] = {
+    "plan_generator": _plan_generator,
+    "section_planner": _section_planner,
+    "section_researcher": _section_researcher,
+    "research_evaluator": _research_evaluator,
+    "enhanced_search_executor": _enhanced_search_executor,
+    "report_composer": _report_composer,
+    "research_pipeline": _research_pipeline,
+    "interactive_planner_agent": _interactive_planner_agent,
+    "root_agent": _interactive_planner_agent,
+}
+
+
+def __getattr__(name: str) -> BaseAgent:
+    """Builds the agent graph on first access to any module-level agent."""
+    if factory := _AGENT_FACTORIES.get(name):
+        return factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
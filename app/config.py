@@ -36,11 +36,18 @@ class ResearchConfiguration:
         critic_model (str): Model for evaluation tasks.
         worker_model (str): Model for working/generation tasks.
         max_search_iterations (int): Maximum search iterations allowed.
+        max_follow_up_queries (int): Maximum follow-up queries searched in parallel
+            per refinement iteration.
+        response_cache_size (int): Maximum model responses kept in the response cache.
+        response_cache_ttl_seconds (float): Lifetime of a cached model response.
     """
 
     critic_model: str = "gemini-2.5-pro"
     worker_model: str = "gemini-2.5-flash"
     max_search_iterations: int = 5
+    max_follow_up_queries: int = 7
+    response_cache_size: int = 128
+    response_cache_ttl_seconds: float = 3600.0
 
 
 config = ResearchConfiguration()
@@ -52,6 +52,8 @@ export default function App() {
   const [isCheckingBackend, setIsCheckingBackend] = useState(true);
   const currentAgentRef = useRef('');
   const accumulatedTextRef = useRef("");
+  const streamedReportRef = useRef("");
+  const reportMessageIdRef = useRef("");
   const scrollAreaRef = useRef<HTMLDivElement>(null);
 
   const retryWithBackoff = async (
@@ -183,12 +185,14 @@ export default function App() {
       }
 
 
-      return { textParts, agent, finalReportWithCitations, functionCall, functionResponse, sourceCount, sources };
+      const partial = Boolean(parsed.partial);
+
+      return { textParts, agent, partial, finalReportWithCitations, functionCall, functionResponse, sourceCount, sources };
     } catch (error) {
       // Log the error and a truncated version of the problematic data for easier debugging.
       const truncatedData = data.length > 200 ? data.substring(0, 200) + "..." : data;
       console.error('Error parsing SSE data. Raw data (truncated): "', truncatedData, '". Error details:', error);
-      return { textParts: [], agent: '', finalReportWithCitations: undefined, functionCall: null, functionResponse: null, sourceCount: 0, sources: null };
+      return { textParts: [], agent: '', partial: false, finalReportWithCitations: undefined, functionCall: null, functionResponse: null, sourceCount: 0, sources: null };
     }
   };
 
@@ -203,8 +207,6 @@ export default function App() {
         return "Initial Web Research";
       case "research_evaluator":
         return "Evaluating Research Quality";
-      case "EscalationChecker":
-        return "Quality Assessment";
       case "enhanced_search_executor":
         return "Enhanced Web Research";
       case "research_pipeline":
@@ -215,12 +217,35 @@ export default function App() {
       case "root_agent":
         return "Interactive Planning";
       default:
+        if (agentName.startsWith("follow_up_searcher_")) {
+          return "Follow-up Web Research";
+        }
         return `Processing (${agentName || 'Unknown Agent'})`;
     }
   };
 
+  // Creates the final report message on first use, then replaces its content.
+  const upsertReportMessage = (content: string) => {
+    const reportMessageId = reportMessageIdRef.current;
+    setMessages(prev => prev.some(msg => msg.id === reportMessageId)
+      ? prev.map(msg => msg.id === reportMessageId ? { ...msg, content } : msg)
+      : [...prev, { type: "ai", content, id: reportMessageId, agent: currentAgentRef.current, finalReportWithCitations: true }]);
+    setDisplayData(content);
+  };
+
   const processSseEventData = (jsonData: string, aiMessageId: string) => {
-    const { textParts, agent, finalReportWithCitations, functionCall, functionResponse, sourceCount, sources } = extractDataFromSSE(jsonData);
+    const { textParts, agent, partial, finalReportWithCitations, functionCall, functionResponse, sourceCount, sources } = extractDataFromSSE(jsonData);
+
+    if (partial) {
+      // Stream the report as it is written; every other agent's partial text
+      // is repeated in its final aggregated event, which is handled below.
+      if (agent === "report_composer_with_citations" && textParts.length > 0) {
+        currentAgentRef.current = agent;
+        streamedReportRef.current += textParts.join("");
+        upsertReportMessage(streamedReportRef.current);
+      }
+      return;
+    }
 
     if (sourceCount > 0) {
       console.log('[SSE HANDLER] Updating websiteCount. Current sourceCount:', sourceCount);
@@ -276,9 +301,7 @@ export default function App() {
     }
 
     if (agent === "report_composer_with_citations" && finalReportWithCitations) {
-      const finalReportMessageId = Date.now().toString() + "_final";
-      setMessages(prev => [...prev, { type: "ai", content: finalReportWithCitations as string, id: finalReportMessageId, agent: currentAgentRef.current, finalReportWithCitations: true }]);
-      setDisplayData(finalReportWithCitations as string);
+      upsertReportMessage(finalReportWithCitations as string);
     }
   };
 
@@ -313,6 +336,8 @@ export default function App() {
       const aiMessageId = Date.now().toString() + "_ai";
       currentAgentRef.current = ''; // Reset current agent
       accumulatedTextRef.current = ''; // Reset accumulated text
+      streamedReportRef.current = ''; // Reset streamed report text
+      reportMessageIdRef.current = aiMessageId + "_final";
 
       setMessages(prev => [...prev, {
         type: "ai",
@@ -336,7 +361,7 @@ export default function App() {
               parts: [{ text: query }],
               role: "user"
             },
-            streaming: false
+            streaming: true
           }),
         });
 
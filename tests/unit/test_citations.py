@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for citation tag rendering."""
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types as genai_types
+
+from app.agent import (
+    _CITATION_LINKS_KEY,
+    _PENDING_CITATION_KEY,
+    _citation_links,
+    _render_citation_chunk,
+    _render_citations,
+    citation_links_callback,
+    citation_replacement_callback,
+    citation_streaming_callback,
+)
+
+SOURCES = {
+    "src-1": {"title": "Report", "domain": "example.com", "url": "https://a.example"},
+    "src-2": {"title": None, "domain": "b.example", "url": "https://b.example"},
+}
+
+
+def test_render_citations_accepts_tag_variants() -> None:
+    """Quoted, single-quoted and unquoted tags with loose spacing are replaced."""
+    links = _citation_links(SOURCES)
+    report = (
+        "A<cite source=\"src-1\" /> B<cite  source = 'src-1'/> C<cite source=src-1 />"
+    )
+    assert _render_citations(report, links) == (
+        "A [Report](https://a.example) B [Report](https://a.example)"
+        " C [Report](https://a.example)"
+    )
+
+
+def test_render_citations_falls_back_to_domain() -> None:
+    """A source without a title is labelled with its domain."""
+    links = _citation_links(SOURCES)
+    assert _render_citations('x<cite source="src-2" />', links) == (
+        "x [b.example](https://b.example)"
+    )
+
+
+def test_render_citations_drops_unknown_and_keeps_malformed_tags() -> None:
+    """Unknown ids are removed; text that is not a valid tag is left alone."""
+    links = _citation_links(SOURCES)
+    assert _render_citations('a<cite source="src-9" />b', links) == "ab"
+    assert _render_citations('a<cite source="doc-1" />b', links) == (
+        'a<cite source="doc-1" />b'
+    )
+
+
+def _context(state: dict[str, Any]) -> CallbackContext:
+    return cast(CallbackContext, SimpleNamespace(state=state))
+
+
+def _text_response(text: str, **kwargs: Any) -> LlmResponse:
+    return LlmResponse(
+        content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]),
+        **kwargs,
+    )
+
+
+def _response_text(response: LlmResponse | None) -> str:
+    assert response is not None and response.content and response.content.parts
+    return response.content.parts[0].text or ""
+
+
+def test_citation_links_callback_stores_table_in_temp_state() -> None:
+    """The link table is built once per model call and not persisted."""
+    state: dict[str, Any] = {"sources": SOURCES}
+    citation_links_callback(_context(state), LlmRequest())
+    assert state[_CITATION_LINKS_KEY] == _citation_links(SOURCES)
+
+
+def test_citation_replacement_callback_publishes_rendered_report() -> None:
+    """The report rendered by the model callback is published unchanged."""
+    state = {"final_cited_report": "Claim  [Report](https://a.example)."}
+    citation_replacement_callback(_context(state))
+    assert state["final_report_with_citations"] == state["final_cited_report"]
+
+
+def test_render_citation_chunk_holds_back_split_tags() -> None:
+    """Chunks split anywhere inside a tag concatenate to the full rendering."""
+    links = _citation_links(SOURCES)
+    report = 'One <cite source="src-1" />, two<cite source="src-9" /> .'
+    expected = _render_citations(report, links).replace(" ,", ",").replace(" .", ".")
+    for split in range(len(report) + 1):
+        first, pending = _render_citation_chunk(report[:split], links)
+        second, pending = _render_citation_chunk(pending + report[split:], links)
+        assert first + second + pending == expected
+
+
+def test_render_citation_chunk_does_not_hold_back_plain_text() -> None:
+    """A stray `<` that cannot start a tag is emitted immediately."""
+    assert _render_citation_chunk("a < b", {}) == ("a < b", "")
+    assert _render_citation_chunk("a <c", {}) == ("a", " <c")
+
+
+def test_citation_streaming_callback_buffers_in_temp_state() -> None:
+    """The pending tag lives in `temp:` state and is flushed by the last chunk."""
+    state: dict[str, Any] = {"sources": SOURCES}
+    context = _context(state)
+    citation_links_callback(context, LlmRequest())
+    chunks = ["Claim <ci", 'te source="src-1"', " /> done", "."]
+    streamed = []
+    for i, chunk in enumerate(chunks):
+        finish = genai_types.FinishReason.STOP if i == len(chunks) - 1 else None
+        response = citation_streaming_callback(
+            context, _text_response(chunk, partial=True, finish_reason=finish)
+        )
+        streamed.append(_response_text(response))
+    assert streamed[:2] == ["Claim", ""]
+    assert state[_PENDING_CITATION_KEY] == ""
+    assert "".join(streamed) == "Claim  [Report](https://a.example) done."
+
+
+def test_citation_streaming_callback_renders_final_response() -> None:
+    """The aggregated, non-partial response carries no raw tags."""
+    context = _context(
+        {
+            _CITATION_LINKS_KEY: _citation_links(SOURCES),
+            _PENDING_CITATION_KEY: "<cite",
+        }
+    )
+    response = citation_streaming_callback(
+        context, _text_response('Claim <cite source="src-1" /> .')
+    )
+    assert _response_text(response) == "Claim  [Report](https://a.example)."
@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for the parallel follow-up searchers."""
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from google.adk.agents.callback_context import CallbackContext
+
+from app.agent import _make_follow_up_searcher, merge_follow_up_findings_callback
+
+
+def _context(state: dict[str, Any]) -> CallbackContext:
+    return cast(CallbackContext, SimpleNamespace(state=state, agent_name="test"))
+
+
+def test_active_searcher_clears_previous_finding() -> None:
+    """A searcher with no new output does not re-merge last iteration's finding."""
+    state: dict[str, Any] = {
+        "research_evaluation": {"follow_up_queries": [{"search_query": "new"}]},
+        "follow_up_query_0": "old",
+        "follow_up_findings_0": "old finding",
+        "section_research_findings": "initial",
+    }
+    callback = _make_follow_up_searcher(0).before_agent_callback
+    assert callable(callback)
+    assert callback(_context(state)) is None
+    assert state["follow_up_query_0"] == "new"
+    assert state["follow_up_findings_0"] == ""
+    merge_follow_up_findings_callback(_context(state))
+    assert state["section_research_findings"] == "initial"
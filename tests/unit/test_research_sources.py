@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for incremental research source collection."""
+
+from types import SimpleNamespace
+from typing import cast
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types as genai_types
+
+from app.agent import collect_research_sources_callback
+
+
+def _grounded_event(url: str, claim: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        grounding_metadata=genai_types.GroundingMetadata(
+            grounding_chunks=[
+                genai_types.GroundingChunk(
+                    web=genai_types.GroundingChunkWeb(
+                        uri=url, title=url, domain="example.com"
+                    )
+                )
+            ],
+            grounding_supports=[
+                genai_types.GroundingSupport(
+                    segment=genai_types.Segment(text=claim),
+                    grounding_chunk_indices=[0],
+                    confidence_scores=[0.9],
+                )
+            ],
+        )
+    )
+
+
+def _context(events: list[SimpleNamespace]) -> CallbackContext:
+    session = SimpleNamespace(events=events)
+    return cast(
+        CallbackContext,
+        SimpleNamespace(state={}, _invocation_context=SimpleNamespace(session=session)),
+    )
+
+
+def test_rescan_does_not_duplicate_claims() -> None:
+    """Events already collected are skipped on the next call."""
+    context = _context([_grounded_event("https://a.example", "claim a")])
+    collect_research_sources_callback(context)
+    collect_research_sources_callback(context)
+    sources = context.state["sources"]
+    assert list(sources) == ["src-1"]
+    assert sources["src-1"]["supported_claims"] == [
+        {"text_segment": "claim a", "confidence": 0.9}
+    ]
+    assert context.state["_last_event_idx"] == 1
+
+
+def test_new_events_are_collected_incrementally() -> None:
+    """Events appended after the watermark are collected and ids continue."""
+    events = [_grounded_event("https://a.example", "claim a")]
+    context = _context(events)
+    collect_research_sources_callback(context)
+    events.append(SimpleNamespace(grounding_metadata=None))
+    events.append(_grounded_event("https://a.example", "claim a2"))
+    events.append(_grounded_event("https://b.example", "claim b"))
+    collect_research_sources_callback(context)
+    sources = context.state["sources"]
+    assert context.state["url_to_short_id"] == {
+        "https://a.example": "src-1",
+        "https://b.example": "src-2",
+    }
+    assert [c["text_segment"] for c in sources["src-1"]["supported_claims"]] == [
+        "claim a",
+        "claim a2",
+    ]
+    assert len(sources["src-2"]["supported_claims"]) == 1
+    assert context.state["_last_event_idx"] == 4
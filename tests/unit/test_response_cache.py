@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit tests for the model response cache callbacks."""
+
+import json
+from collections.abc import AsyncGenerator, Iterator
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from app import agent
+from app.agent import (
+    Feedback,
+    cached_model_response_callback,
+    store_model_response_callback,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> Iterator[None]:
+    agent._response_cache.clear()
+    yield
+    agent._response_cache.clear()
+
+
+def _request(text: str) -> LlmRequest:
+    return LlmRequest(
+        model="gemini-2.5-flash",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+    )
+
+
+def _response(text: str, partial: bool = False) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        partial=partial,
+    )
+
+
+def _context() -> CallbackContext:
+    return cast(CallbackContext, SimpleNamespace(state={}, agent_name="test_agent"))
+
+
+def _call(request: LlmRequest, response: LlmResponse) -> LlmResponse | None:
+    """Runs one model call through both callbacks, returning any replay."""
+    context = _context()
+    if cached := cached_model_response_callback(context, request):
+        return cached
+    store_model_response_callback(context, response)
+    return None
+
+
+def test_identical_request_is_replayed() -> None:
+    """A second identical request gets the first response back."""
+    assert _call(_request("plan"), _response("first")) is None
+    replayed = _call(_request("plan"), _response("second"))
+    assert replayed is not None and replayed.content and replayed.content.parts
+    assert replayed.content.parts[0].text == "first"
+
+
+def test_different_contents_miss() -> None:
+    """Requests that differ in their contents do not share a response."""
+    _call(_request("plan a"), _response("a"))
+    assert _call(_request("plan b"), _response("b")) is None
+
+
+def test_partial_responses_are_not_stored() -> None:
+    """Streamed chunks never populate the cache."""
+    _call(_request("plan"), _response("chunk", partial=True))
+    assert not agent._response_cache
+
+
+def test_expired_entries_are_evicted(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entries older than the TTL are dropped instead of replayed."""
+    monkeypatch.setattr(agent.config, "response_cache_ttl_seconds", 0.0)
+    _call(_request("plan"), _response("first"))
+    assert _call(_request("plan"), _response("second")) is None
+
+
+def test_least_recently_used_entry_is_evicted(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The cache never grows past its configured size."""
+    monkeypatch.setattr(agent.config, "response_cache_size", 1)
+    _call(_request("a"), _response("a"))
+    _call(_request("b"), _response("b"))
+    assert len(agent._response_cache) == 1
+    assert _call(_request("a"), _response("a2")) is None
+
+
+class CountingLlm(BaseLlm):
+    """Fake model that returns a fixed Feedback payload and counts calls."""
+
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        yield _response(json.dumps({"grade": "pass", "comment": "ok"}))
+
+
+@pytest.mark.asyncio
+async def test_replay_populates_output_schema_state() -> None:
+    """A replayed response still fills the agent's structured output_key."""
+    model = CountingLlm(model="gemini-2.5-pro")
+    evaluator = LlmAgent(
+        name="evaluator",
+        model=model,
+        instruction="Evaluate.",
+        output_schema=Feedback,
+        output_key="research_evaluation",
+        before_model_callback=cached_model_response_callback,
+        after_model_callback=store_model_response_callback,
+    )
+    runner = InMemoryRunner(agent=evaluator, app_name="test")
+    message = types.Content(role="user", parts=[types.Part(text="Proceed")])
+    for _ in range(2):
+        session = await runner.session_service.create_session(
+            app_name="test", user_id="user"
+        )
+        async for _event in runner.run_async(
+            user_id="user", session_id=session.id, new_message=message
+        ):
+            pass
+        stored = await runner.session_service.get_session(
+            app_name="test", user_id="user", session_id=session.id
+        )
+        assert stored is not None
+        assert stored.state["research_evaluation"] == {
+            "grade": "pass",
+            "comment": "ok",
+        }
+    assert model.calls == 1